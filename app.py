@@ -1,29 +1,87 @@
 from flask import Flask, request, jsonify, send_file, render_template
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import os
+import re
+import math
+import time
+import threading
 import tempfile
-import json
+import shutil
+import hashlib
+import zipfile
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
-from pdf_table_extractor import PDFTableExtractor
+from pdf_table_extractor import (
+    PDFTableExtractor, WORKER_MP_CONTEXT, dataframe_to_csv_bytes, dataframe_to_records, write_excel_sheets
+)
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from operator import attrgetter
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Custom JSON encoder to handle NaN values
-class CustomJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if pd.isna(obj) or (isinstance(obj, float) and np.isnan(obj)):
-            return None
-        return super().default(obj)
+# orjson options shared by API responses and saved JSON files
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def _orjson_default(obj):
+    """Serialize values orjson cannot handle natively (NaN/inf floats are already emitted as null)."""
+    if pd.api.types.is_scalar(obj) and pd.isna(obj):
+        return None
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_orjson_default, option=ORJSON_OPTIONS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_orjson_default, option=ORJSON_OPTIONS),
+            mimetype=self.mimetype
+        )
+
+def atomic_write(path, write):
+    """
+    Call write(f) on a uniquely named temporary file next to path, then move it
+    into place, so readers and concurrent writers never see a partial file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def write_json_file(path, data):
+    """Write data to a pretty-printed JSON file, replacing it atomically."""
+    payload = orjson.dumps(data, default=_orjson_default, option=ORJSON_OPTIONS | orjson.OPT_INDENT_2)
+    atomic_write(path, lambda f: f.write(payload))
 
 app = Flask(__name__)
 CORS(app)
-app.json_encoder = CustomJSONEncoder
+app.json = ORJSONProvider(app)
 
 # Configuration
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
@@ -36,6 +94,40 @@ os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
 
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'pdf'}
+_ALLOWED_FILE_RE = re.compile(
+    r'.*\.(?:%s)\Z' % '|'.join(map(re.escape, ALLOWED_EXTENSIONS)),
+    re.IGNORECASE | re.DOTALL
+)
+
+# Filenames that secure_filename() would return unchanged
+_SAFE_FILENAME_RE = re.compile(r'[A-Za-z0-9-](?:[A-Za-z0-9_.-]*[A-Za-z0-9-])?\Z')
+
+# Chunk size used when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Chunk size and (connect, read) timeout used when downloading PDFs from URLs
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = (5, 60)
+
+# Number of worker processes used per request (page extraction, /batch-extract
+# and /analyze-pdf)
+MAX_WORKERS = min(os.cpu_count() or 1, 4)
+
+# In-memory index of JSON files in the output folder (filename -> os.stat_result),
+# refreshed from disk once it is older than JSON_INDEX_TTL seconds
+JSON_INDEX_TTL = 5.0
+_json_index = {}
+_json_index_folder = None
+_json_index_time = None
+_json_index_lock = threading.Lock()
+
+# Pooled HTTP session reused across /extract-tables-url requests
+http_session = requests.Session()
+http_session.mount('http://', HTTPAdapter(pool_connections=10, pool_maxsize=20))
+http_session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+# Extracts the text of a TableHeader
+_header_content = attrgetter('content')
 
 def clean_data_for_json(data):
     """Clean data to ensure it's JSON serializable."""
@@ -43,20 +135,57 @@ def clean_data_for_json(data):
         return {k: clean_data_for_json(v) for k, v in data.items()}
     elif isinstance(data, list):
         return [clean_data_for_json(item) for item in data]
-    elif pd.isna(data) or (isinstance(data, float) and np.isnan(data)):
-        return None
-    elif isinstance(data, (int, float)):
-        # Handle infinity and other special float values
-        if np.isinf(data) or np.isnan(data):
-            return None
+    elif data is None or isinstance(data, (str, int)):
         return data
+    elif isinstance(data, (float, np.floating)):
+        # Handle NaN, infinity and other special float values
+        return data if math.isfinite(data) else None
+    elif pd.api.types.is_scalar(data) and pd.isna(data):
+        return None
     else:
         return data
 
+def request_timestamp():
+    """Return a per-request file name prefix: the current time plus a random suffix."""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.urandom(4).hex()}"
+
+def copy_stream(src, dst, chunk_size=UPLOAD_CHUNK_SIZE):
+    """Copy src to dst in fixed-size chunks and return the SHA-256 hex digest of the data."""
+    digest = hashlib.sha256()
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+        dst.write(chunk)
+    return digest.hexdigest()
+
+def save_upload(file, path):
+    """Stream an uploaded file to disk and return its SHA-256 hex digest."""
+    with open(path, 'wb') as dst:
+        return copy_stream(file.stream, dst)
+
+def _cache_path(digest, include_headers):
+    """Path of the cached JSON extraction result for a PDF digest."""
+    suffix = '' if include_headers else '_noheaders'
+    return os.path.join(app.config['OUTPUT_FOLDER'], 'cache', f"{digest[:16]}{suffix}.json")
+
+def _store_cached_result(json_path, digest, include_headers):
+    """Keep a digest-keyed copy of a saved JSON result for later requests."""
+    cache_path = _cache_path(digest, include_headers)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(json_path, 'rb') as src:
+        atomic_write(cache_path, lambda f: shutil.copyfileobj(src, f))
+
 def allowed_file(filename):
     """Check if the uploaded file has an allowed extension."""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return _ALLOWED_FILE_RE.match(filename) is not None
+
+def safe_filename(filename):
+    """Return a secure version of filename, skipping secure_filename() for names that are already safe."""
+    if _SAFE_FILENAME_RE.match(filename):
+        return filename
+    return secure_filename(filename)
 
 @app.route('/')
 def index():
@@ -72,6 +201,134 @@ def health_check():
         'service': 'PDF Table Extractor API'
     })
 
+def _extract_tables_response(temp_path, filename, timestamp, output_format, include_headers, digest=None):
+    """Extract tables from a saved PDF and build the response for the requested output format."""
+    # Serve a previous JSON result for identical PDF content
+    if output_format == 'json' and digest:
+        cache_path = _cache_path(digest, include_headers)
+        if os.path.exists(cache_path):
+            logger.info("Serving cached result for %s", filename)
+            os.remove(temp_path)
+            return send_file(cache_path, mimetype='application/json')
+    
+    logger.info("Processing PDF: %s", filename)
+    
+    # Extract tables
+    with PDFTableExtractor(temp_path, max_workers=MAX_WORKERS) as extractor:
+        tables = extractor.extract_all_tables()
+    
+    # Get summary
+    summary = extractor.get_table_summary(tables)
+    
+    # Prepare response based on output format
+    if output_format == 'json':
+        # Generate JSON filename
+        json_filename = f"extracted_tables_{timestamp}.json"
+        json_path = os.path.join(app.config['OUTPUT_FOLDER'], json_filename)
+        
+        response_data = {
+            'summary': clean_data_for_json(summary),
+            'tables': [],
+            'filename': json_filename
+        }
+        
+        for table in tables:
+            table_data = {
+                'table_id': table.table_id,
+                'page_number': table.page_number,
+                'confidence_score': table.confidence_score,
+                'headers': list(map(_header_content, table.headers)) if include_headers else (),
+                'data': dataframe_to_records(table.data) if not table.data.empty else [],
+                'shape': {
+                    'rows': len(table.data),
+                    'columns': len(table.data.columns)
+                }
+            }
+            response_data['tables'].append(table_data)
+        
+        # Save JSON file to output folder
+        saved = False
+        try:
+            write_json_file(json_path, response_data)
+            saved = True
+            _index_json_file(json_path)
+            logger.info("JSON file saved: %s", json_path)
+            if digest:
+                _store_cached_result(json_path, digest, include_headers)
+        except Exception as e:
+            logger.error("Error saving JSON file: %s", e)
+        
+        # Clean up temporary file
+        os.remove(temp_path)
+        
+        # Serve the saved file instead of serializing the payload a second time
+        if saved:
+            return send_file(json_path, mimetype='application/json')
+        return jsonify(response_data)
+    
+    elif output_format == 'excel':
+        # Generate Excel file
+        output_filename = f"extracted_tables_{timestamp}.xlsx"
+        output_path = os.path.join(app.config['OUTPUT_FOLDER'], output_filename)
+        
+        extractor.export_tables_to_excel(output_path, tables)
+        
+        # Clean up temporary file
+        os.remove(temp_path)
+        
+        return send_file(
+            output_path,
+            as_attachment=True,
+            download_name=output_filename,
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
+    
+    elif output_format == 'csv':
+        # Write each table's CSV straight into a zip archive
+        zip_filename = f"extracted_tables_{timestamp}.zip"
+        zip_path = os.path.join(app.config['OUTPUT_FOLDER'], zip_filename)
+        
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
+            for table in tables:
+                arcname = f"table_{table.page_number}_{table.table_id}.csv"
+                zipf.writestr(arcname, dataframe_to_csv_bytes(table.data))
+        
+        # Clean up temporary file
+        os.remove(temp_path)
+        
+        return send_file(
+            zip_path,
+            as_attachment=True,
+            download_name=zip_filename,
+            mimetype='application/zip'
+        )
+    
+    elif output_format == 'parquet':
+        # Write each table as a Parquet file into a zip archive
+        zip_filename = f"extracted_tables_{timestamp}.zip"
+        zip_path = os.path.join(app.config['OUTPUT_FOLDER'], zip_filename)
+        
+        # Parquet is already compressed, so entries are stored as-is
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) as zipf:
+            for table in tables:
+                arcname = f"table_{table.page_number}_{table.table_id}.parquet"
+                zipf.writestr(arcname, table.data.to_parquet(
+                    index=False, engine='pyarrow', compression='zstd', compression_level=1
+                ))
+        
+        # Clean up temporary file
+        os.remove(temp_path)
+        
+        return send_file(
+            zip_path,
+            as_attachment=True,
+            download_name=zip_filename,
+            mimetype='application/zip'
+        )
+    
+    else:
+        return jsonify({'error': 'Invalid output format. Use "json", "excel", "csv", or "parquet".'}), 400
+
 @app.route('/extract-tables', methods=['POST'])
 def extract_tables():
     """
@@ -79,7 +336,7 @@ def extract_tables():
     
     Expected form data:
     - file: PDF file to process
-    - output_format: 'json', 'excel', or 'csv' (optional, default: 'json')
+    - output_format: 'json', 'excel', 'csv', or 'parquet' (optional, default: 'json')
     - include_headers: boolean (optional, default: True)
     """
     try:
@@ -100,142 +357,118 @@ def extract_tables():
         include_headers = request.form.get('include_headers', 'true').lower() == 'true'
         
         # Save uploaded file temporarily
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = safe_filename(file.filename)
+        timestamp = request_timestamp()
         temp_filename = f"{timestamp}_{filename}"
         temp_path = os.path.join(app.config['UPLOAD_FOLDER'], temp_filename)
         
-        file.save(temp_path)
+        digest = save_upload(file, temp_path)
         
-        logger.info(f"Processing PDF: {filename}")
+        return _extract_tables_response(temp_path, filename, timestamp, output_format, include_headers, digest)
+    
+    except Exception as e:
+        logger.error("Error processing PDF: %s", e)
+        return jsonify({'error': f'Error processing PDF: {str(e)}'}), 500
+
+@app.route('/extract-tables-stream', methods=['POST'])
+def extract_tables_stream():
+    """
+    Extract tables from a PDF sent as the raw request body.
+    
+    The body is streamed straight to disk, bypassing multipart parsing.
+    
+    Expected query parameters:
+    - filename: original PDF filename (optional, default: 'upload.pdf')
+    - output_format: 'json', 'excel', 'csv', or 'parquet' (optional, default: 'json')
+    - include_headers: boolean (optional, default: True)
+    """
+    try:
+        filename = request.args.get('filename', 'upload.pdf')
         
-        # Extract tables
-        with PDFTableExtractor(temp_path) as extractor:
-            tables = extractor.extract_all_tables()
+        if not allowed_file(filename):
+            return jsonify({'error': 'Invalid file type. Only PDF files are allowed.'}), 400
         
-        # Get summary
-        summary = extractor.get_table_summary(tables)
+        # Get optional parameters
+        output_format = request.args.get('output_format', 'json').lower()
+        include_headers = request.args.get('include_headers', 'true').lower() == 'true'
         
-        # Prepare response based on output format
-        if output_format == 'json':
-            # Generate JSON filename
-            json_filename = f"extracted_tables_{timestamp}.json"
-            json_path = os.path.join(app.config['OUTPUT_FOLDER'], json_filename)
-            
-            response_data = {
-                'summary': clean_data_for_json(summary),
-                'tables': [],
-                'filename': json_filename
-            }
-            
-            for table in tables:
-                table_data = {
-                    'table_id': table.table_id,
-                    'page_number': table.page_number,
-                    'confidence_score': table.confidence_score,
-                    'headers': [h.content for h in table.headers] if include_headers else [],
-                    'data': clean_data_for_json(table.data.to_dict('records')) if not table.data.empty else [],
-                    'shape': {
-                        'rows': len(table.data),
-                        'columns': len(table.data.columns)
-                    }
-                }
-                response_data['tables'].append(table_data)
-            
-            # Save JSON file to output folder
-            try:
-                with open(json_path, 'w', encoding='utf-8') as f:
-                    json.dump(response_data, f, indent=2, ensure_ascii=False, cls=CustomJSONEncoder)
-                logger.info(f"JSON file saved: {json_path}")
-            except Exception as e:
-                logger.error(f"Error saving JSON file: {e}")
-            
-            # Clean up temporary file
-            os.remove(temp_path)
-            
-            return jsonify(response_data)
+        # Stream request body to disk
+        filename = safe_filename(filename)
+        timestamp = request_timestamp()
+        temp_filename = f"{timestamp}_{filename}"
+        temp_path = os.path.join(app.config['UPLOAD_FOLDER'], temp_filename)
         
-        elif output_format == 'excel':
-            # Generate Excel file
-            output_filename = f"extracted_tables_{timestamp}.xlsx"
-            output_path = os.path.join(app.config['OUTPUT_FOLDER'], output_filename)
-            
-            extractor.export_tables_to_excel(output_path, tables)
-            
-            # Clean up temporary file
+        # Don't leave a partial upload behind if the body is cut off or too large
+        try:
+            with open(temp_path, 'wb') as dst:
+                digest = copy_stream(request.stream, dst)
+        except BaseException:
             os.remove(temp_path)
-            
-            return send_file(
-                output_path,
-                as_attachment=True,
-                download_name=output_filename,
-                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
+            raise
         
-        elif output_format == 'csv':
-            # Generate CSV files
-            output_dir = os.path.join(app.config['OUTPUT_FOLDER'], f"tables_{timestamp}")
-            extractor.export_tables_to_csv(output_dir, tables)
-            
-            # Create a zip file containing all CSV files
-            import zipfile
-            zip_filename = f"extracted_tables_{timestamp}.zip"
-            zip_path = os.path.join(app.config['OUTPUT_FOLDER'], zip_filename)
-            
-            with zipfile.ZipFile(zip_path, 'w') as zipf:
-                for root, dirs, files in os.walk(output_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, output_dir)
-                        zipf.write(file_path, arcname)
-            
-            # Clean up temporary files
+        if os.path.getsize(temp_path) == 0:
             os.remove(temp_path)
-            import shutil
-            shutil.rmtree(output_dir)
-            
-            return send_file(
-                zip_path,
-                as_attachment=True,
-                download_name=zip_filename,
-                mimetype='application/zip'
-            )
+            return jsonify({'error': 'No file provided'}), 400
         
-        else:
-            return jsonify({'error': 'Invalid output format. Use "json", "excel", or "csv".'}), 400
+        return _extract_tables_response(temp_path, filename, timestamp, output_format, include_headers, digest)
     
+    except RequestEntityTooLarge:
+        return jsonify({'error': 'File too large'}), 413
     except Exception as e:
-        logger.error(f"Error processing PDF: {str(e)}")
+        logger.error("Error processing PDF: %s", e)
         return jsonify({'error': f'Error processing PDF: {str(e)}'}), 500
 
+def _get_json_index(output_folder):
+    """Return a snapshot of the JSON file index, rescanning the folder once it is older than JSON_INDEX_TTL."""
+    global _json_index, _json_index_folder, _json_index_time
+    
+    with _json_index_lock:
+        now = time.monotonic()
+        if (_json_index_folder != output_folder or _json_index_time is None
+                or now - _json_index_time > JSON_INDEX_TTL):
+            index = {}
+            if os.path.exists(output_folder):
+                with os.scandir(output_folder) as it:
+                    for entry in it:
+                        if entry.name.endswith('.json') and entry.is_file():
+                            index[entry.name] = entry.stat()
+            _json_index = index
+            _json_index_folder = output_folder
+            _json_index_time = now
+        
+        return dict(_json_index)
+
+def _index_json_file(json_path):
+    """Add a newly written JSON file to the index without rescanning the folder."""
+    with _json_index_lock:
+        if _json_index_folder == os.path.dirname(json_path):
+            _json_index[os.path.basename(json_path)] = os.stat(json_path)
+
 @app.route('/list-json-files', methods=['GET'])
 def list_json_files():
     """List all JSON files in the output folder."""
     try:
-        json_files = []
-        output_folder = app.config['OUTPUT_FOLDER']
-        
-        if os.path.exists(output_folder):
-            for filename in os.listdir(output_folder):
-                if filename.endswith('.json'):
-                    file_path = os.path.join(output_folder, filename)
-                    file_stats = os.stat(file_path)
-                    json_files.append({
-                        'filename': filename,
-                        'size': file_stats.st_size,
-                        'created': datetime.fromtimestamp(file_stats.st_ctime).isoformat(),
-                        'modified': datetime.fromtimestamp(file_stats.st_mtime).isoformat()
-                    })
+        entries = list(_get_json_index(app.config['OUTPUT_FOLDER']).items())
         
         # Sort by modification time (newest first)
-        json_files.sort(key=lambda x: x['modified'], reverse=True)
+        entries.sort(key=lambda e: e[1].st_mtime, reverse=True)
+        
+        json_files = [
+            {
+                'filename': name,
+                'size': file_stats.st_size,
+                'created': datetime.fromtimestamp(file_stats.st_ctime).isoformat(),
+                'modified': datetime.fromtimestamp(file_stats.st_mtime).isoformat()
+            }
+            for name, file_stats in entries
+        ]
         
         return jsonify({
             'files': json_files,
             'total_files': len(json_files)
         })
     except Exception as e:
-        logger.error(f"Error listing JSON files: {e}")
+        logger.error("Error listing JSON files: %s", e)
         return jsonify({'error': f'Error listing files: {str(e)}'}), 500
 
 @app.route('/download-json/<filename>', methods=['GET'])
@@ -254,7 +487,7 @@ def download_json(filename):
             mimetype='application/json'
         )
     except Exception as e:
-        logger.error(f"Error downloading JSON file {filename}: {e}")
+        logger.error("Error downloading JSON file %s: %s", filename, e)
         return jsonify({'error': f'Error downloading file: {str(e)}'}), 500
 
 @app.route('/extract-tables-url', methods=['POST'])
@@ -276,73 +509,52 @@ def extract_tables_from_url():
             return jsonify({'error': 'PDF URL is required'}), 400
         
         pdf_url = data['pdf_url']
-        output_format = data.get('output_format', 'json').lower()
         include_headers = data.get('include_headers', True)
         
-        # Download PDF from URL
-        import requests
-        import tempfile
-        
-        logger.info(f"Downloading PDF from: {pdf_url}")
+        timestamp = request_timestamp()
         
-        response = requests.get(pdf_url, stream=True)
-        response.raise_for_status()
-        
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            for chunk in response.iter_content(chunk_size=8192):
-                temp_file.write(chunk)
-            temp_path = temp_file.name
-        
-        # Extract tables
-        with PDFTableExtractor(temp_path) as extractor:
-            tables = extractor.extract_all_tables()
-        
-        # Get summary
-        summary = extractor.get_table_summary(tables)
-        
-        # Prepare response
-        response_data = {
-            'summary': clean_data_for_json(summary),
-            'tables': [],
-            'filename': f"extracted_tables_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        }
-        
-        for table in tables:
-            table_data = {
-                'table_id': table.table_id,
-                'page_number': table.page_number,
-                'confidence_score': table.confidence_score,
-                'headers': [h.content for h in table.headers] if include_headers else [],
-                'data': clean_data_for_json(table.data.to_dict('records')) if not table.data.empty else [],
-                'shape': {
-                    'rows': len(table.data),
-                    'columns': len(table.data.columns)
-                }
-            }
-            response_data['tables'].append(table_data)
-        
-        # Save JSON file to output folder
-        try:
-            json_filename = f"extracted_tables_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            json_path = os.path.join(app.config['OUTPUT_FOLDER'], json_filename)
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(response_data, f, indent=2, ensure_ascii=False, cls=CustomJSONEncoder)
-            logger.info(f"JSON file saved from URL: {json_path}")
-        except Exception as e:
-            logger.error(f"Error saving JSON file from URL: {e}")
+        # Download PDF from URL
+        logger.info("Downloading PDF from: %s", pdf_url)
         
-        # Clean up temporary file
-        os.unlink(temp_path)
+        with http_session.get(pdf_url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            
+            # Save to temporary file
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
+                digest = copy_stream(response.raw, temp_file, DOWNLOAD_CHUNK_SIZE)
+                temp_path = temp_file.name
         
-        return jsonify(response_data)
+        return _extract_tables_response(temp_path, pdf_url, timestamp, 'json', include_headers, digest)
     
     except requests.exceptions.RequestException as e:
         return jsonify({'error': f'Error downloading PDF: {str(e)}'}), 400
     except Exception as e:
-        logger.error(f"Error processing PDF from URL: {str(e)}")
+        logger.error("Error processing PDF from URL: %s", e)
         return jsonify({'error': f'Error processing PDF: {str(e)}'}), 500
 
+def _analyze_pages(temp_path, page_numbers):
+    """Analyze the given pages of a PDF for potential tables (runs in a worker process)."""
+    page_infos = []
+    
+    with PDFTableExtractor(temp_path) as extractor:
+        for page_num in page_numbers:
+            page = extractor.pdf.pages[page_num - 1]
+            
+            # Count potential table areas
+            table_areas = extractor._detect_table_areas(page)
+            
+            page_infos.append({
+                'page_number': page_num,
+                'width': page.width,
+                'height': page.height,
+                'text_blocks': len(page.extract_words()),
+                'potential_tables': len(table_areas),
+                'table_areas': table_areas
+            })
+    
+    return page_infos
+
 @app.route('/analyze-pdf', methods=['POST'])
 def analyze_pdf():
     """
@@ -364,41 +576,43 @@ def analyze_pdf():
             return jsonify({'error': 'Invalid file type. Only PDF files are allowed.'}), 400
         
         # Save uploaded file temporarily
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = safe_filename(file.filename)
+        timestamp = request_timestamp()
         temp_filename = f"{timestamp}_{filename}"
         temp_path = os.path.join(app.config['UPLOAD_FOLDER'], temp_filename)
         
-        file.save(temp_path)
+        save_upload(file, temp_path)
         
-        # Analyze PDF structure
+        # Get basic PDF info
         with PDFTableExtractor(temp_path) as extractor:
-            # Get basic PDF info
-            pdf_info = {
-                'total_pages': len(extractor.pdf.pages),
-                'pages_with_tables': [],
-                'estimated_tables': 0
-            }
+            total_pages = len(extractor.pdf.pages)
+        
+        pdf_info = {
+            'total_pages': total_pages,
+            'pages_with_tables': [],
+            'estimated_tables': 0
+        }
+        
+        # Analyze pages concurrently, each worker handling an interleaved subset
+        workers = min(MAX_WORKERS, total_pages)
+        page_groups = [list(range(start, total_pages + 1, workers)) for start in range(1, workers + 1)]
+        
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=WORKER_MP_CONTEXT) as executor:
+                group_results = list(executor.map(_analyze_pages, repeat(temp_path), page_groups))
+        else:
+            group_results = [_analyze_pages(temp_path, group) for group in page_groups]
+        
+        page_infos = sorted(
+            (page_info for group in group_results for page_info in group),
+            key=lambda p: p['page_number']
+        )
+        
+        for page_info in page_infos:
+            if page_info['potential_tables'] > 0:
+                pdf_info['pages_with_tables'].append(page_info)
             
-            # Analyze each page
-            for page_num, page in enumerate(extractor.pdf.pages, 1):
-                page_info = {
-                    'page_number': page_num,
-                    'width': page.width,
-                    'height': page.height,
-                    'text_blocks': len(page.extract_words()),
-                    'potential_tables': 0
-                }
-                
-                # Count potential table areas
-                table_areas = extractor._detect_table_areas(page)
-                page_info['potential_tables'] = len(table_areas)
-                page_info['table_areas'] = table_areas
-                
-                if page_info['potential_tables'] > 0:
-                    pdf_info['pages_with_tables'].append(page_info)
-                
-                pdf_info['estimated_tables'] += page_info['potential_tables']
+            pdf_info['estimated_tables'] += page_info['potential_tables']
         
         # Clean up temporary file
         os.remove(temp_path)
@@ -406,9 +620,55 @@ def analyze_pdf():
         return jsonify(pdf_info)
     
     except Exception as e:
-        logger.error(f"Error analyzing PDF: {str(e)}")
+        logger.error("Error analyzing PDF: %s", e)
         return jsonify({'error': f'Error analyzing PDF: {str(e)}'}), 500
 
+def _extract_one(temp_path, filename, keep_dataframes=False):
+    """
+    Extract tables from a single PDF for batch processing (runs in a worker process).
+    
+    With keep_dataframes, the result carries the table DataFrames under
+    '_dataframes' instead of converting them to JSON records.
+    """
+    try:
+        # Files are already spread across worker processes, so extract pages serially
+        with PDFTableExtractor(temp_path, max_workers=1) as extractor:
+            tables = extractor.extract_all_tables()
+        
+        summary = extractor.get_table_summary(tables)
+        
+        file_result = {
+            'filename': filename,
+            'summary': clean_data_for_json(summary),
+            'tables': []
+        }
+        
+        if keep_dataframes:
+            file_result['_dataframes'] = [(table.table_id, table.data) for table in tables]
+        
+        for table in tables:
+            table_data = {
+                'table_id': table.table_id,
+                'page_number': table.page_number,
+                'confidence_score': table.confidence_score,
+                'headers': list(map(_header_content, table.headers)),
+                'data': dataframe_to_records(table.data) if not (keep_dataframes or table.data.empty) else [],
+                'shape': {
+                    'rows': len(table.data),
+                    'columns': len(table.data.columns)
+                }
+            }
+            file_result['tables'].append(table_data)
+        
+        return file_result
+        
+    except Exception as e:
+        logger.error("Error processing %s: %s", filename, e)
+        return {
+            'filename': filename,
+            'error': str(e)
+        }
+
 @app.route('/batch-extract', methods=['POST'])
 def batch_extract():
     """
@@ -428,82 +688,69 @@ def batch_extract():
             return jsonify({'error': 'No files selected'}), 400
         
         output_format = request.form.get('output_format', 'json').lower()
+        timestamp = request_timestamp()
         
-        batch_results = []
         temp_files = []
+        filenames = []
+        batch_results = []
         
-        for file in files:
-            if file.filename == '' or not allowed_file(file.filename):
-                continue
-            
-            # Save file temporarily
-            filename = secure_filename(file.filename)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            temp_filename = f"{timestamp}_{filename}"
-            temp_path = os.path.join(app.config['UPLOAD_FOLDER'], temp_filename)
-            
-            file.save(temp_path)
-            temp_files.append(temp_path)
-            
-            # Extract tables
-            try:
-                with PDFTableExtractor(temp_path) as extractor:
-                    tables = extractor.extract_all_tables()
-                
-                summary = extractor.get_table_summary(tables)
-                
-                file_result = {
-                    'filename': filename,
-                    'summary': clean_data_for_json(summary),
-                    'tables': []
-                }
-                
-                for table in tables:
-                    table_data = {
-                        'table_id': table.table_id,
-                        'page_number': table.page_number,
-                        'confidence_score': table.confidence_score,
-                        'headers': [h.content for h in table.headers],
-                        'data': clean_data_for_json(table.data.to_dict('records')) if not table.data.empty else [],
-                        'shape': {
-                            'rows': len(table.data),
-                            'columns': len(table.data.columns)
-                        }
-                    }
-                    file_result['tables'].append(table_data)
+        try:
+            for file_idx, file in enumerate(files):
+                if file.filename == '' or not allowed_file(file.filename):
+                    continue
                 
-                batch_results.append(file_result)
+                # Save file temporarily
+                filename = safe_filename(file.filename)
+                temp_filename = f"{timestamp}_{file_idx}_{filename}"
+                temp_path = os.path.join(app.config['UPLOAD_FOLDER'], temp_filename)
                 
-            except Exception as e:
-                logger.error(f"Error processing {filename}: {str(e)}")
-                batch_results.append({
-                    'filename': filename,
-                    'error': str(e)
-                })
-        
-        # Clean up temporary files
-        for temp_file in temp_files:
-            try:
-                os.remove(temp_file)
-            except:
-                pass
+                temp_files.append(temp_path)
+                filenames.append(filename)
+                save_upload(file, temp_path)
+            
+            # Extract tables from all files concurrently
+            if temp_files:
+                with ProcessPoolExecutor(max_workers=min(MAX_WORKERS, len(temp_files)),
+                                         mp_context=WORKER_MP_CONTEXT) as executor:
+                    futures = [
+                        executor.submit(_extract_one, temp_path, filename, output_format == 'excel')
+                        for temp_path, filename in zip(temp_files, filenames)
+                    ]
+                    
+                    for filename, future in zip(filenames, futures):
+                        try:
+                            batch_results.append(future.result())
+                        except Exception as e:
+                            # Worker crashes and unpicklable results only fail their own file
+                            logger.error("Error processing %s: %s", filename, e)
+                            batch_results.append({
+                                'filename': filename,
+                                'error': str(e)
+                            })
+        finally:
+            # Clean up temporary files
+            for temp_file in temp_files:
+                try:
+                    os.remove(temp_file)
+                except:
+                    pass
         
         if output_format == 'excel':
             # Create Excel file with multiple sheets
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             output_filename = f"batch_extracted_tables_{timestamp}.xlsx"
             output_path = os.path.join(app.config['OUTPUT_FOLDER'], output_filename)
             
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-                for file_result in batch_results:
-                    if 'error' not in file_result:
-                        for table in file_result['tables']:
-                            sheet_name = f"{file_result['filename'][:20]}_{table['table_id']}"
-                            if len(sheet_name) > 31:
-                                sheet_name = sheet_name[:31]
-                            
-                            df = pd.DataFrame(table['data'])
-                            df.to_excel(writer, sheet_name=sheet_name, index=False)
+            sheets = []
+            for file_result in batch_results:
+                if 'error' not in file_result:
+                    for table_id, df in file_result.pop('_dataframes'):
+                        sheet_name = f"{file_result['filename'][:20]}_{table_id}"
+                        if len(sheet_name) > 31:
+                            sheet_name = sheet_name[:31]
+                        
+                        sheets.append((sheet_name, df))
+            
+            write_excel_sheets(output_path, sheets)
             
             return send_file(
                 output_path,
@@ -520,7 +767,7 @@ def batch_extract():
             })
     
     except Exception as e:
-        logger.error(f"Error in batch extraction: {str(e)}")
+        logger.error("Error in batch extraction: %s", e)
         return jsonify({'error': f'Error in batch extraction: {str(e)}'}), 500
 
 if __name__ == '__main__':
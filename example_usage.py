@@ -7,10 +7,15 @@ to extract tables from PDF files with complex headers.
 """
 
 import os
+import re
 import sys
 from pdf_table_extractor import PDFTableExtractor
 import pandas as pd
 
+# Header keywords used to classify tables in the advanced example
+FINANCIAL_KEYWORD_RE = re.compile(r'revenue|profit|income|expense', re.IGNORECASE)
+DATA_KEYWORD_RE = re.compile(r'date|name|id|code', re.IGNORECASE)
+
 def example_basic_extraction():
     """Basic example of extracting tables from a PDF file."""
     print("=== Basic Table Extraction Example ===")
@@ -110,14 +115,14 @@ def example_advanced_processing():
             
             # Find tables with specific header patterns
             for table in tables:
-                headers_text = [h.content.lower() for h in table.headers]
+                headers_text = ' '.join(h.content for h in table.headers)
                 
                 # Look for financial tables
-                if any(keyword in ' '.join(headers_text) for keyword in ['revenue', 'profit', 'income', 'expense']):
+                if FINANCIAL_KEYWORD_RE.search(headers_text):
                     print(f"Financial table found: {table.table_id}")
                 
                 # Look for data tables
-                if any(keyword in ' '.join(headers_text) for keyword in ['date', 'name', 'id', 'code']):
+                if DATA_KEYWORD_RE.search(headers_text):
                     print(f"Data table found: {table.table_id}")
                 
                 # Analyze table structure
@@ -1,20 +1,69 @@
 import pdfplumber
 import pandas as pd
 import numpy as np
-import cv2
-from PIL import Image
-import io
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import os
 import re
-from typing import List, Dict, Tuple, Optional, Any
+import sys
+from typing import List, Dict, Tuple, Optional, Any, Iterable
 import logging
+import multiprocessing
 from dataclasses import dataclass
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+try:
+    import pymupdf  # optional faster parsing backend
+except ImportError:
+    try:
+        import fitz as pymupdf  # PyMuPDF releases before 1.24.3
+    except ImportError:
+        pymupdf = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Keywords that commonly appear in header cells
+HEADER_KEYWORD_RE = re.compile(r'total|sum|count|name|date|id', re.IGNORECASE)
+
+def _is_header_text(text: str) -> bool:
+    """Check whether a stripped cell contains a header keyword or is a short phrase."""
+    # Phrases of fewer than four words are often headers
+    return HEADER_KEYWORD_RE.search(text) is not None or len(text.split(None, 3)) < 4
+
+def _match_header_patterns(cells: np.ndarray) -> np.ndarray:
+    """Apply _is_header_text to every cell of an array of strings."""
+    flat = cells.ravel().tolist()
+    return np.fromiter(map(_is_header_text, flat), dtype=bool, count=len(flat)).reshape(cells.shape)
+
+# Documents with fewer pages are extracted in-process; starting worker
+# processes costs more than it saves on short documents
+MIN_PAGES_FOR_PARALLEL = 4
+
+# Start method for worker pools. Forking a threaded server process (Flask,
+# gunicorn gthread) can deadlock the child on a lock held by another thread,
+# so workers come from a clean forkserver process, or are spawned where
+# forkserver is unavailable.
+WORKER_MP_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+# Supported PDF parsing backends
+BACKENDS = ('pdfplumber', 'pymupdf')
+
+# Elementwise str(cell).strip() over an object array, returning an object array
+_strip_cells = np.frompyfunc(lambda cell: str(cell).strip(), 1, 1)
+
+# Longest side, in pixels, of page renders used for image-based table detection
+MAX_DETECTION_IMAGE_SIZE = 1000
+
+# Slotted dataclasses (Python 3.10+) avoid a per-instance __dict__
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_OPTIONS)
 class TableHeader:
     """Represents a table header with its hierarchy level and content."""
     content: str
@@ -22,8 +71,9 @@ class TableHeader:
     row_index: int
     col_span: int = 1
     row_span: int = 1
+    col_index: int = 0
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ExtractedTable:
     """Represents an extracted table with processed headers and data."""
     headers: List[TableHeader]
@@ -32,19 +82,114 @@ class ExtractedTable:
     table_id: str
     confidence_score: float
 
+# Excel's limit on worksheet name length
+MAX_SHEET_NAME_LENGTH = 31
+
+def _unique_sheet_name(sheet_name: str, used_names: set) -> str:
+    """
+    Truncate a worksheet name to Excel's limit and, if it is already taken
+    (Excel compares names case-insensitively), add a _2, _3, ... suffix.
+    """
+    name = sheet_name[:MAX_SHEET_NAME_LENGTH]
+    suffix_num = 2
+    while name.lower() in used_names:
+        suffix = f"_{suffix_num}"
+        name = sheet_name[:MAX_SHEET_NAME_LENGTH - len(suffix)] + suffix
+        suffix_num += 1
+    
+    used_names.add(name.lower())
+    return name
+
+def write_excel_sheets(output_path: str, sheets: Iterable[Tuple[str, pd.DataFrame]]):
+    """
+    Write each (sheet_name, DataFrame) pair to its own sheet of an Excel workbook.
+    Repeated sheet names get a numeric suffix.
+    
+    Rows are flushed to disk as they are written (xlsxwriter's constant_memory
+    mode). That mode only supports row-by-row writes, which DataFrame.to_excel
+    does not do, so cells are written here directly.
+    """
+    import xlsxwriter
+    
+    workbook = xlsxwriter.Workbook(output_path, {
+        'constant_memory': True,
+        'strings_to_numbers': False,
+        # Same datetime format DataFrame.to_excel uses
+        'default_date_format': 'YYYY-MM-DD HH:MM:SS'
+    })
+    # Matches the header style used by DataFrame.to_excel
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+    
+    used_names = set()
+    
+    try:
+        for sheet_name, df in sheets:
+            worksheet = workbook.add_worksheet(_unique_sheet_name(sheet_name, used_names))
+            worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+            
+            # Infinity is written as text (like to_excel's inf_rep); missing values are left blank
+            values = df.replace({np.inf: 'inf', -np.inf: '-inf'})
+            values = values.astype(object).where(values.notna(), None)
+            for row_idx, row in enumerate(values.itertuples(index=False), 1):
+                worksheet.write_row(row_idx, 0, row)
+    finally:
+        workbook.close()
+
+def dataframe_to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """
+    Serialize a DataFrame to UTF-8 CSV without its index.
+    
+    Uses pyarrow's C++ CSV writer, falling back to pandas for frames Arrow
+    cannot convert (e.g. columns mixing strings and numbers).
+    """
+    try:
+        arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowException, ValueError):
+        return df.to_csv(index=False).encode('utf-8')
+    
+    buffer = pa.BufferOutputStream()
+    pacsv.write_csv(arrow_table, buffer)
+    return buffer.getvalue().to_pybytes()
+
+def dataframe_to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert a DataFrame to a list of record dicts with missing and infinite values as None."""
+    # Infinity has no JSON representation, so it is treated like a missing value
+    df = df.replace([np.inf, -np.inf], np.nan)
+    
+    values = df.to_numpy(dtype=object)
+    values[df.isna().to_numpy()] = None
+    
+    columns = df.columns.tolist()
+    return [dict(zip(columns, row)) for row in values.tolist()]
+
 class PDFTableExtractor:
     """
     Advanced PDF table extractor that can handle complex tables with multi-line headers
     and sub-headers.
     """
     
-    def __init__(self, pdf_path: str):
+    def __init__(self, pdf_path: str, max_workers: Optional[int] = None,
+                 backend: str = 'pdfplumber'):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported backend: {backend}. Use one of: {', '.join(BACKENDS)}")
+        if backend == 'pymupdf' and pymupdf is None:
+            logger.warning("PyMuPDF is not installed; falling back to pdfplumber")
+            backend = 'pdfplumber'
+        
         self.pdf_path = pdf_path
+        self.backend = backend
         self.pdf = None
         self.tables = []
+        # Grayscale render of the page being processed, keyed by page number
+        self._gray_cache = {}
+        # Number of worker processes used to extract pages in parallel
+        self.max_workers = max_workers or os.cpu_count() or 1
         
     def __enter__(self):
-        self.pdf = pdfplumber.open(self.pdf_path)
+        if self.backend == 'pymupdf':
+            self.pdf = pymupdf.open(self.pdf_path)
+        else:
+            self.pdf = pdfplumber.open(self.pdf_path)
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -53,106 +198,233 @@ class PDFTableExtractor:
     
     def extract_all_tables(self) -> List[ExtractedTable]:
         """Extract all tables from the PDF with processed headers."""
+        total_pages = self._page_count()
+        workers = min(self.max_workers, total_pages) if total_pages >= MIN_PAGES_FOR_PARALLEL else 1
+        
+        if workers <= 1:
+            extracted_tables = []
+            for page_num in range(1, total_pages + 1):
+                extracted_tables.extend(self._extract_page(self._get_page(page_num), page_num))
+            return extracted_tables
+        
+        # Fan pages out to worker processes, each handling an interleaved subset
+        page_groups = [list(range(start, total_pages + 1, workers)) for start in range(1, workers + 1)]
+        
+        with ProcessPoolExecutor(max_workers=workers, mp_context=WORKER_MP_CONTEXT) as executor:
+            group_results = list(executor.map(_extract_page_group, repeat(self.pdf_path), page_groups, repeat(self.backend)))
+        
+        extracted_tables = [table for group in group_results for table in group]
+        extracted_tables.sort(key=lambda t: t.page_number)
+        
+        return extracted_tables
+    
+    def _page_count(self) -> int:
+        """Number of pages in the open document."""
+        if self.backend == 'pymupdf':
+            return self.pdf.page_count
+        return len(self.pdf.pages)
+    
+    def _get_page(self, page_num: int):
+        """Load a page of the open document by its 1-based page number."""
+        if self.backend == 'pymupdf':
+            return self.pdf.load_page(page_num - 1)
+        return self.pdf.pages[page_num - 1]
+    
+    def _extract_page(self, page, page_num: int) -> List[ExtractedTable]:
+        """Extract and process all tables from a single page."""
+        logger.info("Processing page %s", page_num)
         extracted_tables = []
         
-        for page_num, page in enumerate(self.pdf.pages, 1):
-            logger.info(f"Processing page {page_num}")
-            
-            # Extract tables using multiple methods
-            tables = self._extract_tables_from_page(page, page_num)
-            
-            for table_idx, table in enumerate(tables):
-                try:
-                    processed_table = self._process_table(table, page_num, table_idx)
-                    if processed_table:
-                        extracted_tables.append(processed_table)
-                except Exception as e:
-                    logger.error(f"Error processing table {table_idx} on page {page_num}: {e}")
-                    continue
+        # Extract tables using multiple methods
+        tables = self._extract_tables_from_page(page, page_num)
+        
+        for table_idx, table in enumerate(tables):
+            try:
+                processed_table = self._process_table(table, page_num, table_idx)
+                if processed_table:
+                    extracted_tables.append(processed_table)
+            except Exception as e:
+                logger.error("Error processing table %s on page %s: %s", table_idx, page_num, e)
+                continue
         
         return extracted_tables
     
     def _extract_tables_from_page(self, page, page_num: int) -> List:
-        """Extract tables from a single page using multiple extraction methods."""
+        """
+        Extract tables from a single page, trying progressively more expensive
+        extraction methods only while no tables have been found.
+        """
+        if self.backend == 'pymupdf':
+            return self._extract_tables_from_pymupdf_page(page, page_num)
+        
         tables = []
         
         # Method 1: pdfplumber's built-in table finder
         try:
-            pdfplumber_tables = page.find_tables()
-            tables.extend(pdfplumber_tables)
+            tables = page.find_tables()
         except Exception as e:
-            logger.warning(f"pdfplumber table extraction failed on page {page_num}: {e}")
+            logger.warning("pdfplumber table extraction failed on page %s: %s", page_num, e)
         
         # Method 2: Extract tables using table settings
-        try:
-            table_settings = {
-                "vertical_strategy": "text",
-                "horizontal_strategy": "text",
-                "intersection_y_tolerance": 10,
-                "intersection_x_tolerance": 10
-            }
-            custom_tables = page.find_tables(table_settings)
-            tables.extend(custom_tables)
-        except Exception as e:
-            logger.warning(f"Custom table extraction failed on page {page_num}: {e}")
+        if not tables:
+            try:
+                table_settings = {
+                    "vertical_strategy": "text",
+                    "horizontal_strategy": "text",
+                    "intersection_y_tolerance": 10,
+                    "intersection_x_tolerance": 10
+                }
+                tables = page.find_tables(table_settings)
+            except Exception as e:
+                logger.warning("Custom table extraction failed on page %s: %s", page_num, e)
+        
+        # Method 3: Extract using explicit table areas. Rasterizing the page is
+        # only worthwhile when it has no extractable text (e.g. scanned pages).
+        if not tables and not page.chars:
+            try:
+                # Look for table-like structures in the page
+                table_areas = self._detect_table_areas(page)
+                for area in table_areas:
+                    # Cropped pages filter the parent page's already-parsed
+                    # objects, so the content stream is not parsed again
+                    cropped_page = page.within_bbox(area)
+                    area_tables = cropped_page.find_tables()
+                    tables.extend(area_tables)
+            except Exception as e:
+                logger.warning("Table area detection failed on page %s: %s", page_num, e)
+            finally:
+                self._gray_cache.pop(page.page_number, None)
+        
+        return self._dedupe_by_bbox(tables)
+    
+    def _extract_tables_from_pymupdf_page(self, page, page_num: int) -> List:
+        """Extract tables from a PyMuPDF page, falling back to the text strategy."""
+        tables = []
         
-        # Method 3: Extract using explicit table areas
+        # Method 1: PyMuPDF's line-based table finder
         try:
-            # Look for table-like structures in the page
-            table_areas = self._detect_table_areas(page)
-            for area in table_areas:
-                cropped_page = page.within_bbox(area)
-                area_tables = cropped_page.find_tables()
-                tables.extend(area_tables)
+            tables = page.find_tables().tables
         except Exception as e:
-            logger.warning(f"Table area detection failed on page {page_num}: {e}")
+            logger.warning("PyMuPDF table extraction failed on page %s: %s", page_num, e)
         
-        return tables
+        # Method 2: Text-alignment based detection
+        if not tables:
+            try:
+                tables = page.find_tables(strategy="text").tables
+            except Exception as e:
+                logger.warning("PyMuPDF text table extraction failed on page %s: %s", page_num, e)
+        
+        return self._dedupe_by_bbox(tables)
     
-    def _detect_table_areas(self, page) -> List[Tuple[float, float, float, float]]:
-        """Detect potential table areas on the page using image processing."""
-        areas = []
+    def _dedupe_by_bbox(self, tables: List, iou_threshold: float = 0.7) -> List:
+        """Drop tables whose bounding box mostly overlaps one that was already kept."""
+        kept = []
         
-        try:
+        for table in sorted(tables, key=lambda t: (t.bbox[0], t.bbox[1])):
+            if all(self._bbox_iou(table.bbox, other.bbox) < iou_threshold for other in kept):
+                kept.append(table)
+        
+        # Return the survivors in their original (reading) order, which table ids are based on
+        kept_ids = {id(table) for table in kept}
+        return [table for table in tables if id(table) in kept_ids]
+    
+    @staticmethod
+    def _bbox_iou(a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]) -> float:
+        """Intersection over union of two (x0, top, x1, bottom) bounding boxes."""
+        inter_w = min(a[2], b[2]) - max(a[0], b[0])
+        inter_h = min(a[3], b[3]) - max(a[1], b[1])
+        if inter_w <= 0 or inter_h <= 0:
+            return 0.0
+        
+        intersection = inter_w * inter_h
+        union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - intersection
+        return intersection / union if union > 0 else 0.0
+    
+    def _page_grayscale(self, page) -> Tuple[np.ndarray, float]:
+        """
+        Render the page as a grayscale image for table detection, returning the
+        image and its scale relative to the full render. The render is cached
+        while the page is being processed.
+        """
+        import cv2
+        
+        key = page.page_number
+        
+        if key not in self._gray_cache:
+            # Only keep the page currently being processed
+            self._gray_cache.clear()
+            
             # Convert page to image
             img = page.to_image()
-            img_array = np.array(img.original)
+            img_array = np.asarray(img.original)
             
             # Convert to grayscale
             gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
             
+            # Downscale large renders; table outlines survive and edge detection touches fewer pixels
+            scale = min(1.0, MAX_DETECTION_IMAGE_SIZE / max(gray.shape))
+            if scale < 1.0:
+                gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            
+            self._gray_cache[key] = (gray, scale)
+        
+        return self._gray_cache[key]
+    
+    def _detect_table_areas(self, page) -> List[Tuple[float, float, float, float]]:
+        """Detect potential table areas on the page using image processing."""
+        import cv2
+        
+        areas = []
+        
+        try:
+            gray, scale = self._page_grayscale(page)
+            
             # Apply edge detection
             edges = cv2.Canny(gray, 50, 150, apertureSize=3)
             
             # Find contours
             contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             
-            # Filter contours that might be tables
-            for contour in contours:
-                area = cv2.contourArea(contour)
-                if area > 1000:  # Minimum area threshold
-                    x, y, w, h = cv2.boundingRect(contour)
-                    # Convert to page coordinates
-                    page_x = x / img_array.shape[1] * page.width
-                    page_y = y / img_array.shape[0] * page.height
-                    page_w = w / img_array.shape[1] * page.width
-                    page_h = h / img_array.shape[0] * page.height
-                    
-                    areas.append((page_x, page_y, page_x + page_w, page_y + page_h))
+            # Minimum area threshold, in pixels of the original render
+            min_area = 1000 * scale * scale
+            
+            # Bounding rects, in pixels, of contours that might be tables
+            rects = np.array(
+                [cv2.boundingRect(c) for c in contours if cv2.contourArea(c) > min_area],
+                dtype=np.float64
+            )
+            
+            if rects.size:
+                # Convert (x, y, w, h) to page-coordinate (x0, top, x1, bottom)
+                sx = page.width / gray.shape[1]
+                sy = page.height / gray.shape[0]
+                rects *= np.array([sx, sy, sx, sy])
+                rects[:, 2:] += rects[:, :2]
+                areas = [tuple(rect) for rect in rects.tolist()]
                     
         except Exception as e:
-            logger.warning(f"Table area detection failed: {e}")
+            logger.warning("Table area detection failed: %s", e)
         
         return areas
     
+    @staticmethod
+    def _has_cell_text(rows: List[List[Optional[str]]]) -> bool:
+        """Check whether any cell of an extracted grid contains non-blank text."""
+        return any(cell and str(cell).strip() for row in rows for cell in row)
+    
     def _process_table(self, table, page_num: int, table_idx: int) -> Optional[ExtractedTable]:
         """Process a raw table and extract headers and data."""
         try:
-            if not table or not table.extract():
+            if not table:
+                return None
+            
+            rows = table.extract()
+            if not rows or not self._has_cell_text(rows):
+                # Skip spurious detections before any DataFrame work
                 return None
             
             # Convert table to DataFrame
-            df = pd.DataFrame(table.extract())
+            df = pd.DataFrame(rows)
             
             if df.empty:
                 return None
@@ -172,7 +444,7 @@ class PDFTableExtractor:
                 elif confidence > 1.0:
                     confidence = 1.0
             except Exception as e:
-                logger.warning(f"Error calculating confidence score: {e}")
+                logger.warning("Error calculating confidence score: %s", e)
                 confidence = 0.0
             
             return ExtractedTable(
@@ -184,7 +456,7 @@ class PDFTableExtractor:
             )
             
         except Exception as e:
-            logger.error(f"Error processing table {table_idx} on page {page_num}: {e}")
+            logger.error("Error processing table %s on page %s: %s", table_idx, page_num, e)
             # Return a minimal table with error information
             try:
                 return ExtractedTable(
@@ -204,8 +476,11 @@ class PDFTableExtractor:
         # Analyze the first few rows to detect header patterns
         header_rows = self._identify_header_rows(df)
         
+        # Convert the header block once; rows are scanned as numpy arrays
+        cells = df.iloc[:len(header_rows)].to_numpy(dtype=object)
+        
         for row_idx in header_rows:
-            row_headers = self._process_header_row(df.iloc[row_idx], row_idx, header_rows)
+            row_headers = self._process_header_row(cells[row_idx], row_idx, header_rows)
             headers.extend(row_headers)
         
         # Merge and consolidate headers
@@ -218,11 +493,10 @@ class PDFTableExtractor:
         header_rows = []
         
         # Check first few rows for header characteristics
-        for i in range(min(5, len(df))):
-            row = df.iloc[i]
-            
-            # Check if row has header-like characteristics
-            if self._is_header_row(row):
+        is_header = self._header_row_mask(df.iloc[:5].to_numpy(dtype=object))
+        
+        for i, row_is_header in enumerate(is_header):
+            if row_is_header:
                 header_rows.append(i)
             else:
                 # Stop at first non-header row
@@ -230,64 +504,59 @@ class PDFTableExtractor:
         
         return header_rows
     
-    def _is_header_row(self, row) -> bool:
-        """Determine if a row is likely a header row."""
-        # Count non-empty cells
-        non_empty = sum(1 for cell in row if cell and str(cell).strip())
+    def _header_row_mask(self, rows: np.ndarray) -> np.ndarray:
+        """Determine, for each row of a 2-D cell array, whether it is likely a header row."""
+        cells = np.where(pd.isna(rows), '', rows).astype(str)
+        stripped = np.char.strip(cells)
         
-        # Check for header-like patterns
-        header_indicators = 0
+        # Count non-empty cells
+        non_empty = stripped != ''
         
-        for cell in row:
-            if cell:
-                cell_str = str(cell).strip()
-                
-                # Check for common header patterns
-                if (cell_str.isupper() or 
-                    any(keyword in cell_str.lower() for keyword in ['total', 'sum', 'count', 'name', 'date', 'id']) or
-                    len(cell_str.split()) <= 3):  # Short phrases are often headers
-                    header_indicators += 1
+        # Check for common header patterns: upper case, header keywords, or
+        # short phrases (which are often headers). The text patterns are only
+        # checked for cells that are not already upper case.
+        present = cells != ''
+        indicators = present & np.char.isupper(stripped)
+        pending = present & ~indicators
+        indicators[pending] = _match_header_patterns(stripped[pending])
         
         # Row is likely a header if most cells show header characteristics
-        return header_indicators >= non_empty * 0.6
+        return indicators.sum(axis=1) >= non_empty.sum(axis=1) * 0.6
     
-    def _process_header_row(self, row, row_idx: int, header_rows: List[int]) -> List[TableHeader]:
+    def _process_header_row(self, row: np.ndarray, row_idx: int, header_rows: List[int]) -> List[TableHeader]:
         """Process a single header row and extract headers."""
         headers = []
         
+        # Determine header level based on position in header hierarchy
+        level = header_rows.index(row_idx)
+        row_span = self._detect_row_span(header_rows, row_idx)
+        
         for col_idx, cell in enumerate(row):
             if cell and str(cell).strip():
-                # Determine header level based on position in header hierarchy
-                level = header_rows.index(row_idx)
-                
                 # Check for merged cells
                 col_span = self._detect_column_span(row, col_idx)
-                row_span = self._detect_row_span(header_rows, row_idx)
                 
                 header = TableHeader(
                     content=str(cell).strip(),
                     level=level,
                     row_index=row_idx,
                     col_span=col_span,
-                    row_span=row_span
+                    row_span=row_span,
+                    col_index=col_idx
                 )
                 headers.append(header)
         
         return headers
     
-    def _detect_column_span(self, row, col_idx: int) -> int:
+    def _detect_column_span(self, row: np.ndarray, col_idx: int) -> int:
         """Detect if a header spans multiple columns."""
-        span = 1
-        current_cell = row.iloc[col_idx]
+        following = row[col_idx + 1:]
         
-        # Check subsequent columns for similar content
-        for i in range(col_idx + 1, len(row)):
-            if row.iloc[i] == current_cell or not row.iloc[i]:
-                span += 1
-            else:
-                break
+        # Subsequent columns with the same or empty content extend the span
+        continues = (following == row[col_idx]) | pd.isna(following) | (following == '')
+        breaks = np.flatnonzero(~continues)
         
-        return span
+        return 1 + int(breaks[0] if len(breaks) else len(following))
     
     def _detect_row_span(self, header_rows: List[int], row_idx: int) -> int:
         """Detect if a header spans multiple rows."""
@@ -299,32 +568,43 @@ class PDFTableExtractor:
         """Consolidate multi-level headers into a single comprehensive header."""
         consolidated = []
         
-        # Group headers by column position
+        # Group headers by the column they start in
         header_groups = defaultdict(list)
         for header in headers:
-            # Use a simple column position for grouping
-            col_pos = len(header_groups)
-            header_groups[col_pos].append(header)
+            header_groups[header.col_index].append(header)
+        
+        # Headers spanning several columns also label the covered columns that
+        # have headers of their own only in lower header rows
+        for header in headers:
+            for col_idx in range(header.col_index + 1, header.col_index + header.col_span):
+                group = header_groups.get(col_idx)
+                if group and min(h.level for h in group) > header.level:
+                    group.append(header)
         
         # Consolidate each group
-        for col_pos, group in header_groups.items():
-            if group:
-                # Sort by level
-                group.sort(key=lambda h: h.level)
-                
-                # Combine header content
-                combined_content = " - ".join([h.content for h in group])
-                
-                # Create consolidated header
-                consolidated_header = TableHeader(
-                    content=combined_content,
-                    level=0,  # Top level after consolidation
-                    row_index=min(h.row_index for h in group),
-                    col_span=1,
-                    row_span=1
-                )
-                
-                consolidated.append(consolidated_header)
+        for col_idx in sorted(header_groups):
+            group = header_groups[col_idx]
+            
+            # Sort by level
+            group.sort(key=lambda h: h.level)
+            
+            # Combine header content
+            combined_content = " - ".join([h.content for h in group])
+            
+            first_row = min(h.row_index for h in group)
+            last_row = max(h.row_index + h.row_span - 1 for h in group)
+            
+            # Create consolidated header
+            consolidated_header = TableHeader(
+                content=combined_content,
+                level=0,  # Top level after consolidation
+                row_index=first_row,
+                col_span=1,
+                row_span=last_row - first_row + 1,
+                col_index=col_idx
+            )
+            
+            consolidated.append(consolidated_header)
         
         return consolidated
     
@@ -333,7 +613,7 @@ class PDFTableExtractor:
         try:
             # Find the last header row
             if headers:
-                last_header_row = max(h.row_index for h in headers)
+                last_header_row = max(h.row_index + h.row_span - 1 for h in headers)
                 data_start_row = last_header_row + 1
             else:
                 data_start_row = 0
@@ -344,26 +624,15 @@ class PDFTableExtractor:
             else:
                 data_df = pd.DataFrame()
             
-            # Handle column mismatch gracefully
-            if headers and len(headers) > 0:
-                # Ensure we don't exceed the number of columns in the data
-                max_columns = min(len(headers), len(data_df.columns) if not data_df.empty else 0)
+            # Name each column after the header in its column; columns without
+            # a header (or headers beyond the data's width) get generic names
+            if headers and not data_df.empty:
+                column_names = [f"Column_{i+1}" for i in range(len(data_df.columns))]
+                for header in headers:
+                    if header.col_index < len(column_names):
+                        column_names[header.col_index] = header.content
                 
-                if max_columns > 0:
-                    # Create column names from headers
-                    column_names = [h.content for h in headers[:max_columns]]
-                    
-                    # If we have fewer headers than columns, create generic names for remaining columns
-                    if len(column_names) < len(data_df.columns):
-                        for i in range(len(column_names), len(data_df.columns)):
-                            column_names.append(f"Column_{i+1}")
-                    
-                    # Set column names
-                    data_df.columns = column_names
-                else:
-                    # No valid headers, create generic column names
-                    if not data_df.empty:
-                        data_df.columns = [f"Column_{i+1}" for i in range(len(data_df.columns))]
+                data_df.columns = column_names
             
             # Clean the data
             data_df = self._clean_dataframe(data_df)
@@ -371,7 +640,7 @@ class PDFTableExtractor:
             return data_df
             
         except Exception as e:
-            logger.warning(f"Error creating clean dataframe: {e}")
+            logger.warning("Error creating clean dataframe: %s", e)
             # Return empty dataframe with generic columns as fallback
             if not df.empty:
                 fallback_df = df.copy()
@@ -387,13 +656,21 @@ class PDFTableExtractor:
         # Remove completely empty columns
         df = df.dropna(axis=1, how='all')
         
-        # Clean cell values
-        for col in df.columns:
-            df[col] = df[col].astype(str).str.strip()
-            # Replace empty strings with NaN
-            df[col] = df[col].replace('', np.nan)
+        # Duplicate names make columns ambiguous; callers fall back to generic names
+        if not df.columns.is_unique:
+            raise ValueError("DataFrame has duplicate column names")
         
-        return df
+        if df.empty:
+            return df
+        
+        # Clean cell values in a single pass over the whole frame. Stripping the
+        # object array cell by cell avoids fixed-width string arrays sized by the
+        # longest cell.
+        values = _strip_cells(df.to_numpy(dtype=object))
+        # Replace empty strings with NaN
+        values[values == ''] = np.nan
+        
+        return pd.DataFrame(values, index=df.index, columns=df.columns)
     
     def _calculate_confidence_score(self, df: pd.DataFrame, headers: List[TableHeader]) -> float:
         """Calculate a confidence score for the table extraction."""
@@ -407,39 +684,57 @@ class PDFTableExtractor:
         if headers:
             score += 0.3
         
-        # Score for data quality (non-empty cells)
         if not df.empty:
-            non_empty_ratio = df.notna().sum().sum() / (df.shape[0] * df.shape[1])
+            # Compute the non-empty mask once and derive both scores from it
+            mask = df.notna().to_numpy()
+            n_rows, n_cols = mask.shape
+            col_counts = mask.sum(axis=1)
+            
+            # Score for data quality (non-empty cells)
+            non_empty_ratio = col_counts.sum() / (n_rows * n_cols)
             score += non_empty_ratio * 0.2
-        
-        # Score for table structure (consistent number of columns)
-        if not df.empty:
-            col_counts = df.notna().sum(axis=1)
-            consistency = 1 - (col_counts.std() / col_counts.mean()) if col_counts.mean() > 0 else 0
+            
+            # Score for table structure (consistent number of columns)
+            mean_count = col_counts.mean()
+            # Sample standard deviation, undefined for a single row
+            std_count = col_counts.std(ddof=1) if n_rows > 1 else np.nan
+            consistency = 1 - (std_count / mean_count) if mean_count > 0 else 0
             score += consistency * 0.2
         
         return min(score, 1.0)
     
     def export_tables_to_excel(self, output_path: str, tables: List[ExtractedTable]):
         """Export extracted tables to Excel file."""
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            for table in tables:
-                sheet_name = f"Page_{table.page_number}_{table.table_id}"
-                # Truncate sheet name if too long
-                if len(sheet_name) > 31:
-                    sheet_name = sheet_name[:31]
-                
-                table.data.to_excel(writer, sheet_name=sheet_name, index=False)
+        sheets = []
+        for table in tables:
+            sheet_name = f"Page_{table.page_number}_{table.table_id}"
+            # Truncate sheet name if too long
+            if len(sheet_name) > 31:
+                sheet_name = sheet_name[:31]
+            
+            sheets.append((sheet_name, table.data))
+        
+        write_excel_sheets(output_path, sheets)
     
     def export_tables_to_csv(self, output_dir: str, tables: List[ExtractedTable]):
         """Export extracted tables to CSV files."""
-        import os
         os.makedirs(output_dir, exist_ok=True)
         
         for table in tables:
             filename = f"table_{table.page_number}_{table.table_id}.csv"
             filepath = os.path.join(output_dir, filename)
-            table.data.to_csv(filepath, index=False)
+            with open(filepath, 'wb') as f:
+                f.write(dataframe_to_csv_bytes(table.data))
+    
+    def export_tables_to_parquet(self, output_dir: str, tables: List[ExtractedTable]):
+        """Export extracted tables to Parquet files."""
+        os.makedirs(output_dir, exist_ok=True)
+        
+        for table in tables:
+            filename = f"table_{table.page_number}_{table.table_id}.parquet"
+            filepath = os.path.join(output_dir, filename)
+            table.data.to_parquet(filepath, index=False, engine='pyarrow',
+                                  compression='zstd', compression_level=1)
     
     def get_table_summary(self, tables: List[ExtractedTable]) -> Dict[str, Any]:
         """Get a summary of extracted tables."""
@@ -452,17 +747,37 @@ class PDFTableExtractor:
         }
         
         if tables:
-            summary['average_confidence'] = sum(t.confidence_score for t in tables) / len(tables)
+            pages = np.fromiter((t.page_number for t in tables), dtype=np.int64, count=len(tables))
+            confidences = np.fromiter((t.confidence_score for t in tables), dtype=np.float64, count=len(tables))
+            
+            summary['average_confidence'] = float(confidences.mean())
             
-            for table in tables:
-                summary['tables_by_page'][table.page_number] += 1
-                summary['table_details'].append({
+            page_counts = np.bincount(pages)
+            for page_number in np.flatnonzero(page_counts):
+                summary['tables_by_page'][int(page_number)] = int(page_counts[page_number])
+            
+            summary['table_details'] = [
+                {
                     'table_id': table.table_id,
                     'page_number': table.page_number,
                     'rows': len(table.data),
                     'columns': len(table.data.columns),
                     'confidence_score': table.confidence_score,
                     'headers': [h.content for h in table.headers]
-                })
+                }
+                for table in tables
+            ]
         
-        return summary 
\ No newline at end of file
+        return summary
+
+def _extract_page_group(pdf_path: str, page_numbers: List[int],
+                        backend: str = 'pdfplumber') -> List[ExtractedTable]:
+    """Extract tables from the given pages of a PDF (runs in a worker process)."""
+    extracted_tables = []
+    
+    with PDFTableExtractor(pdf_path, max_workers=1, backend=backend) as extractor:
+        for page_num in page_numbers:
+            page = extractor._get_page(page_num)
+            extracted_tables.extend(extractor._extract_page(page, page_num))
+    
+    return extracted_tables
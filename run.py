@@ -5,36 +5,78 @@ Startup script for the PDF Table Extractor Flask application.
 
 import os
 import sys
+import signal
+import threading
 import logging
-from app import app
-from config import get_config
+import logging.handlers
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 
-def setup_logging():
+def setup_logging(config):
     """Setup logging configuration."""
-    config = get_config()
+    log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    
+    if config.LOG_FILE:
+        log_file = logging.FileHandler(config.LOG_FILE)
+        log_file.setFormatter(logging.Formatter(log_format))
+        
+        # Buffer file records and write them in batches; errors flush immediately
+        file_handler = logging.handlers.MemoryHandler(
+            capacity=int(os.environ.get('LOG_BUFFER_SIZE', 1000)),
+            flushLevel=logging.ERROR,
+            target=log_file,
+            flushOnClose=True
+        )
+        
+        # Forked workers (process pools) exit without flushing and would inherit
+        # the parent's records, so empty the buffer before forking and write
+        # records straight through in the child
+        def unbuffer_in_child():
+            file_handler.buffer = []
+            file_handler.capacity = 1
+        
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(before=file_handler.flush, after_in_child=unbuffer_in_child)
+        
+        # logging.shutdown() flushes the buffer at exit; make SIGTERM a normal exit
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    else:
+        file_handler = logging.NullHandler()
     
     logging.basicConfig(
         level=getattr(logging, config.LOG_LEVEL),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        format=log_format,
         handlers=[
             logging.StreamHandler(sys.stdout),
-            logging.FileHandler(config.LOG_FILE) if config.LOG_FILE else logging.NullHandler()
+            file_handler
         ]
     )
 
-def create_directories():
+def ensure_dir(path):
+    """Create a directory, trying mkdir first instead of checking for it beforehand."""
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        if not os.path.isdir(path):
+            raise
+    except FileNotFoundError:
+        # Parent directories are missing
+        os.makedirs(path, exist_ok=True)
+
+def create_directories(config):
     """Create necessary directories if they don't exist."""
-    config = get_config()
-    
     directories = [config.UPLOAD_FOLDER, config.OUTPUT_FOLDER]
     
-    for directory in directories:
-        try:
-            os.makedirs(directory, exist_ok=True)
-            print(f"✓ Directory '{directory}' ready")
-        except Exception as e:
+    # The directories are independent, so create them concurrently
+    with ThreadPoolExecutor(max_workers=len(directories)) as executor:
+        futures = [executor.submit(ensure_dir, directory) for directory in directories]
+    
+    for directory, future in zip(directories, futures):
+        e = future.exception()
+        if e is not None:
             print(f"✗ Error creating directory '{directory}': {e}")
             return False
+        print(f"✓ Directory '{directory}' ready")
     
     return True
 
@@ -46,16 +88,15 @@ def check_dependencies():
         'numpy',
         'cv2',
         'flask',
-        'flask_cors'
+        'flask_cors',
+        'orjson'
     ]
     
-    missing_packages = []
-    
-    for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
-            missing_packages.append(package)
+    # Locate each package without executing it; the app imports them later
+    missing_packages = [
+        package for package in required_packages
+        if importlib.util.find_spec(package) is None
+    ]
     
     if missing_packages:
         print(f"✗ Missing packages: {', '.join(missing_packages)}")
@@ -65,13 +106,29 @@ def check_dependencies():
     print("✓ All dependencies available")
     return True
 
+def warm_imports():
+    """Import the app's heavy dependencies so they are loaded by the time the app is."""
+    try:
+        import numpy, pandas, pdfplumber, flask
+    except ImportError:
+        # Reported by check_dependencies()
+        pass
+
 def main():
     """Main startup function."""
+    from config import get_config
+    
     print("PDF Table Extractor - Starting Server")
     print("=" * 50)
     
+    # Overlap loading the heavy modules with the startup checks below
+    threading.Thread(target=warm_imports, daemon=True).start()
+    
+    # Get configuration
+    config = get_config()
+    
     # Setup logging
-    setup_logging()
+    setup_logging(config)
     logger = logging.getLogger(__name__)
     
     # Check dependencies
@@ -79,11 +136,11 @@ def main():
         sys.exit(1)
     
     # Create directories
-    if not create_directories():
+    if not create_directories(config):
         sys.exit(1)
     
-    # Get configuration
-    config = get_config()
+    # Import the app (and its heavy dependencies) only once the checks pass
+    from app import app
     
     # Configure Flask app
     app.config.from_object(config)
@@ -92,20 +149,31 @@ def main():
     host = os.environ.get('FLASK_HOST', '0.0.0.0')
     port = int(os.environ.get('FLASK_PORT', 5011))
     debug = config.DEBUG
-    
-    print(f"\nServer Configuration:")
-    print(f"  Host: {host}")
-    print(f"  Port: {port}")
-    print(f"  Debug: {debug}")
-    print(f"  Upload folder: {config.UPLOAD_FOLDER}")
-    print(f"  Output folder: {config.OUTPUT_FOLDER}")
-    print(f"  Max file size: {config.MAX_CONTENT_LENGTH / (1024*1024):.1f} MB")
-    
-    print(f"\nStarting server...")
-    print(f"API will be available at: http://{host}:{port}")
-    print(f"Health check: http://{host}:{port}/health")
-    print("\nPress Ctrl+C to stop the server")
-    print("=" * 50)
+    # The reloader re-imports the whole app in a child process; opt in explicitly
+    use_reloader = debug and os.environ.get('FLASK_USE_RELOADER', '0') == '1'
+    
+    banner = "\n".join([
+        "",
+        "Server Configuration:",
+        f"  Host: {host}",
+        f"  Port: {port}",
+        f"  Debug: {debug}",
+        f"  Reloader: {use_reloader}",
+        f"  Upload folder: {config.UPLOAD_FOLDER}",
+        f"  Output folder: {config.OUTPUT_FOLDER}",
+        f"  Max file size: {config.MAX_CONTENT_LENGTH / (1024*1024):.1f} MB",
+        "",
+        "Starting server...",
+        f"API will be available at: http://{host}:{port}",
+        f"Health check: http://{host}:{port}/health",
+        "",
+        "Press Ctrl+C to stop the server",
+        "=" * 50,
+    ])
+    
+    # Write the banner in one go
+    sys.stdout.write(banner + "\n")
+    sys.stdout.flush()
     
     try:
         # Start the Flask application
@@ -113,12 +181,12 @@ def main():
             host=host,
             port=port,
             debug=debug,
-            use_reloader=debug
+            use_reloader=use_reloader
         )
     except KeyboardInterrupt:
         print("\n\nServer stopped by user")
     except Exception as e:
-        logger.error(f"Error starting server: {e}")
+        logger.error("Error starting server: %s", e)
         print(f"\n✗ Error starting server: {e}")
         sys.exit(1)
 
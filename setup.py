@@ -7,14 +7,15 @@ Automates installation and initial setup.
 import os
 import sys
 import subprocess
-import shutil
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 def run_command(command, description):
-    """Run a command and handle errors."""
+    """Run a command (a list of arguments, executed without a shell) and handle errors."""
     print(f"🔄 {description}...")
     try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+        result = subprocess.run(command, check=True, capture_output=True, text=True)
         print(f"✅ {description} completed successfully")
         return True
     except subprocess.CalledProcessError as e:
@@ -32,21 +33,75 @@ def check_python_version():
     print(f"✅ Python {version.major}.{version.minor}.{version.micro} is compatible")
     return True
 
+def requirements_satisfied(path='requirements.txt'):
+    """Check whether every requirement in the file is already installed at a matching version."""
+    try:
+        from packaging.requirements import Requirement
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:
+        return False
+    
+    with open(path) as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            if line.startswith('-'):
+                # pip options (-r, -e, ...) are left to pip
+                return False
+            
+            req = Requirement(line)
+            if req.marker and not req.marker.evaluate():
+                continue
+            
+            try:
+                installed = version(req.name)
+            except PackageNotFoundError:
+                return False
+            if not req.specifier.contains(installed, prereleases=True):
+                return False
+    
+    return True
+
 def install_dependencies():
     """Install required dependencies."""
     print("\n📦 Installing dependencies...")
     
-    # Check if pip is available
-    if not shutil.which('pip'):
+    if requirements_satisfied():
+        print("✅ All requirements already installed")
+        return True
+    
+    # Check if pip is available for this interpreter
+    if importlib.util.find_spec('pip') is None:
         print("❌ pip not found. Please install pip first.")
         return False
     
     # Install dependencies from requirements.txt
-    if not run_command("pip install -r requirements.txt", "Installing Python packages"):
+    if not run_command([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"],
+                       "Installing Python packages"):
         return False
     
     return True
 
+def compile_bytecode():
+    """Pre-compile the project's modules so the first server start loads cached bytecode."""
+    print("\n⚙️  Compiling bytecode...")
+    
+    # pip already byte-compiles installed packages; only the project sources remain
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    return run_command([sys.executable, "-m", "compileall", "-q", "-j", "0", "-l", project_dir],
+                       "Pre-compiling project bytecode")
+
+def ensure_dir(path):
+    """Create a directory (and any missing parents) if it does not exist."""
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        if not os.path.isdir(path):
+            raise
+    except FileNotFoundError:
+        os.makedirs(path, exist_ok=True)
+
 def create_directories():
     """Create necessary directories."""
     print("\n📁 Creating directories...")
@@ -57,13 +112,16 @@ def create_directories():
         'templates'
     ]
     
-    for directory in directories:
-        try:
-            os.makedirs(directory, exist_ok=True)
-            print(f"✅ Created directory: {directory}")
-        except Exception as e:
+    # The directories are independent, so create them concurrently
+    with ThreadPoolExecutor(max_workers=len(directories)) as executor:
+        futures = [executor.submit(ensure_dir, directory) for directory in directories]
+    
+    for directory, future in zip(directories, futures):
+        e = future.exception()
+        if e is not None:
             print(f"❌ Failed to create directory {directory}: {e}")
             return False
+        print(f"✅ Created directory: {directory}")
     
     return True
 
@@ -71,7 +129,7 @@ def run_tests():
     """Run installation tests."""
     print("\n🧪 Running installation tests...")
     
-    if not run_command("python test_installation.py", "Running installation tests"):
+    if not run_command([sys.executable, "test_installation.py"], "Running installation tests"):
         return False
     
     return True
@@ -140,7 +198,7 @@ def display_next_steps():
     print("• API documentation in README.md")
     
     print("\n🆘 Troubleshooting:")
-    print("• Run: python test_installation.py")
+    print("• Run: python test_installation.py --full")
     print("• Check logs in: pdf_extractor.log")
     print("• Ensure all dependencies are installed: pip install -r requirements.txt")
 
@@ -158,6 +216,9 @@ def main():
         print("\n❌ Dependency installation failed. Please check the errors above.")
         sys.exit(1)
     
+    # Compile bytecode (not fatal: Python compiles modules on first import anyway)
+    compile_bytecode()
+    
     # Create directories
     if not create_directories():
         print("\n❌ Directory creation failed. Please check the errors above.")
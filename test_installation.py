@@ -5,25 +5,31 @@ Test script to verify PDF Table Extractor installation and basic functionality.
 
 import sys
 import importlib
+import importlib.util
 import os
+from functools import lru_cache
 
-def test_imports():
+@lru_cache(maxsize=1)
+def get_client():
+    """Return a Flask test client shared by the API tests (imports the app on first use)."""
+    from app import app
+    return app.test_client()
+
+def test_imports(full=False):
     """Test if all required packages can be imported."""
     print("Testing package imports...")
     
-    required_packages = [
-        'pdfplumber',
-        'pandas',
-        'numpy',
-        'cv2',
-        'PIL',
-        'flask',
-        'flask_cors'
-    ]
+    # Imported for real only in the full run, whose DataFrame and Flask checks use them
+    import_packages = ['pandas', 'flask'] if full else []
+    
+    # Only located; loading their native libraries is not needed to check them
+    located_packages = ['cv2', 'pdfplumber', 'PIL', 'flask_cors', 'numpy', 'orjson']
+    if not full:
+        located_packages += ['pandas', 'flask']
     
     failed_imports = []
     
-    for package in required_packages:
+    for package in import_packages:
         try:
             importlib.import_module(package)
             print(f"✓ {package}")
@@ -31,6 +37,13 @@ def test_imports():
             print(f"✗ {package}: {e}")
             failed_imports.append(package)
     
+    for package in located_packages:
+        if importlib.util.find_spec(package) is not None:
+            print(f"✓ {package}")
+        else:
+            print(f"✗ {package}: not installed")
+            failed_imports.append(package)
+    
     if failed_imports:
         print(f"\nFailed to import: {failed_imports}")
         print("Please install missing packages using: pip install -r requirements.txt")
@@ -62,18 +75,17 @@ def test_flask_app():
     print("\nTesting Flask app...")
     
     try:
-        from app import app
+        client = get_client()
         print("✓ Flask app imported successfully")
         
         # Test basic app functionality
-        with app.test_client() as client:
-            response = client.get('/health')
-            if response.status_code == 200:
-                print("✓ Health endpoint working")
-                return True
-            else:
-                print(f"✗ Health endpoint returned status {response.status_code}")
-                return False
+        response = client.get('/health')
+        if response.status_code == 200:
+            print("✓ Health endpoint working")
+            return True
+        else:
+            print(f"✗ Health endpoint returned status {response.status_code}")
+            return False
                 
     except Exception as e:
         print(f"✗ Error testing Flask app: {e}")
@@ -144,17 +156,22 @@ def test_directories():
         return False
 
 def main():
-    """Run all tests."""
+    """Run the installation tests (the full suite with --full or PTE_FULL_TESTS set)."""
     print("PDF Table Extractor - Installation Test")
     print("=" * 50)
     
-    tests = [
-        ("Package Imports", test_imports),
-        ("PDF Extractor", test_pdf_extractor),
-        ("Flask App", test_flask_app),
-        ("Basic Functionality", test_basic_functionality),
-        ("Directory Creation", test_directories)
-    ]
+    # The extractor, Flask and DataFrame checks import the whole stack, so the
+    # default run only checks packages and directories
+    full = '--full' in sys.argv[1:] or bool(os.environ.get('PTE_FULL_TESTS'))
+    
+    tests = [("Package Imports", lambda: test_imports(full))]
+    if full:
+        tests += [
+            ("PDF Extractor", test_pdf_extractor),
+            ("Flask App", test_flask_app),
+            ("Basic Functionality", test_basic_functionality)
+        ]
+    tests.append(("Directory Creation", test_directories))
     
     passed = 0
     total = len(tests)
@@ -171,6 +188,8 @@ def main():
     
     if passed == total:
         print("🎉 All tests passed! Installation is successful.")
+        if not full:
+            print("(Run 'python test_installation.py --full' to also test the extractor and API)")
         print("\nYou can now:")
         print("1. Run the API server: python app.py")
         print("2. Test with example script: python example_usage.py")
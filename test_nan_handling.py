@@ -4,9 +4,10 @@ Test script to verify NaN handling in JSON serialization.
 """
 
 import json
+import orjson
 import pandas as pd
 import numpy as np
-from pdf_table_extractor import PDFTableExtractor, ExtractedTable, TableHeader
+from pdf_table_extractor import PDFTableExtractor, ExtractedTable, TableHeader, dataframe_to_records
 
 def test_nan_handling():
     """Test that NaN values are properly handled in JSON serialization."""
@@ -16,7 +17,7 @@ def test_nan_handling():
     test_data = {
         'Column_1': ['Value1', 'Value2', np.nan, 'Value4'],
         'Column_2': [1, 2, np.nan, 4],
-        'Column_3': [1.5, 2.5, np.nan, 4.5]
+        'Column_3': [1.5, 2.5, np.nan, np.inf]
     }
     
     df = pd.DataFrame(test_data)
@@ -45,27 +46,33 @@ def test_nan_handling():
     except Exception as e:
         print(f"✗ Direct JSON serialization failed: {e}")
     
-    # Test with custom encoder
-    print("\n2. Testing with custom JSON encoder...")
+    # Test with orjson, which writes NaN and infinity as null natively
+    print("\n2. Testing with orjson...")
     
-    class CustomJSONEncoder(json.JSONEncoder):
-        def default(self, obj):
-            if pd.isna(obj) or (isinstance(obj, float) and np.isnan(obj)):
-                return None
-            return super().default(obj)
+    def nan_to_none(obj):
+        """Serialize the values orjson does not handle itself (pandas NA, numpy scalars)."""
+        if pd.api.types.is_scalar(obj) and pd.isna(obj):
+            return None
+        if isinstance(obj, np.generic):
+            return obj.item()
+        raise TypeError
     
     try:
-        json_str = json.dumps(table.data.to_dict('records'), cls=CustomJSONEncoder)
-        print("✓ Custom JSON encoder successful")
+        json_str = orjson.dumps(
+            table.data.to_dict('records'),
+            default=nan_to_none,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode('utf-8')
+        print("✓ orjson serialization successful")
         print(f"JSON output: {json_str}")
     except Exception as e:
-        print(f"✗ Custom JSON encoder failed: {e}")
+        print(f"✗ orjson serialization failed: {e}")
     
     # Test data cleaning function
     print("\n3. Testing data cleaning function...")
     
     def clean_data_for_json(data):
-        """Clean data to ensure it's JSON serializable."""
+        """Clean nested non-DataFrame data to ensure it's JSON serializable."""
         if isinstance(data, dict):
             return {k: clean_data_for_json(v) for k, v in data.items()}
         elif isinstance(data, list):
@@ -80,8 +87,14 @@ def test_nan_handling():
             return data
     
     try:
-        cleaned_data = clean_data_for_json(table.data.to_dict('records'))
-        json_str = json.dumps(cleaned_data)
+        cleaned_data = clean_data_for_json({
+            'table_id': table.table_id,
+            'confidence_score': table.confidence_score
+        })
+        # Table data goes through the same helper the API uses
+        cleaned_data['data'] = dataframe_to_records(table.data)
+        # allow_nan=False rejects NaN and infinity, which are not valid JSON
+        json_str = json.dumps(cleaned_data, allow_nan=False)
         print("✓ Data cleaning function successful")
         print(f"Cleaned JSON output: {json_str}")
     except Exception as e:
@@ -0,0 +1,22 @@
+"""
+WSGI entry point for running the PDF Table Extractor under a production server.
+
+Uses the production configuration unless FLASK_ENV says otherwise.
+
+Example:
+    gunicorn -w 4 -k gthread --threads 4 -b 0.0.0.0:5011 wsgi:application
+"""
+
+import os
+
+from app import app
+from config import get_config
+
+config = get_config(os.environ.get('FLASK_ENV', 'production'))
+app.config.from_object(config)
+
+# Ensure the configured directories exist
+os.makedirs(config.UPLOAD_FOLDER, exist_ok=True)
+os.makedirs(config.OUTPUT_FOLDER, exist_ok=True)
+
+application = app